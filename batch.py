@@ -1,24 +1,68 @@
 import re # 导入正则表达式模块
 
+# 编译一次的单词行匹配（兼容\r\n行尾），findall在C层一次扫完整个文件
+_WORD_RE = re.compile(rb'(?m)^([A-Za-z]+)\r?$')
+
 def read_words_from_txt(file_path):
     """
     从TXT文件读取单词，一行一个，只保留纯英文字母的单词。
+    整个文件一次读入，由编译好的正则批量匹配，省去逐行strip/fullmatch的Python开销。
     """
-    words = []
-    with open(file_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            word = line.strip() # 移除行首尾的空白字符
-            # 检查单词是否只包含英文字母
-            if re.fullmatch(r'[a-zA-Z]+', word):
-                words.append(word)
-    return words
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    return [w.decode('ascii') for w in _WORD_RE.findall(data)]
 
 # 以下是你的原始代码，保持不变
-import json
+import asyncio
+import collections
+import diskcache
+import functools
+import orjson
+import os
+import queue
+import random
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import time
-from bing import fetch_bing_dictionary # 确保这里导入的是修改后的 bing.py
+from bing import CONTENT_MARKER, fetch_bing_dictionary, fetch_html, parse_dictionary_html # 确保这里导入的是修改后的 bing.py
+
+# 持久化缓存：已成功抓取的单词跨进程、跨批次复用，中断的批次可以断点续跑。
+# 词典条目不是一成不变的，缓存7天后过期，过期的词会自动重新抓取
+_CACHE = diskcache.Cache('.bing_cache')
+_CACHE_TTL = 7 * 86400 # 秒
+
+# 熔断器：短时间内失败过多（通常是被限流）时快速失败，
+# 避免32个工作线程各自睡在指数退避里空耗墙钟时间。
+_FAIL_WINDOW = 10      # 失败统计窗口（秒）
+_FAIL_THRESHOLD = 100  # 窗口内触发熔断的失败次数
+_TRIP_COOLDOWN = 30    # 熔断后的冷却时间（秒）
+_recent_failures = collections.deque(maxlen=_FAIL_THRESHOLD)
+_fail_lock = threading.Lock()
+_TRIP = threading.Event()
+
+def _reset_trip():
+    with _fail_lock:
+        _recent_failures.clear()
+    _TRIP.clear()
+    print("熔断冷却结束，恢复抓取。")
+
+def _record_failure():
+    """
+    记录一次抓取失败；窗口内失败数达到阈值时触发熔断，冷却后自动恢复。
+    """
+    now = time.monotonic()
+    with _fail_lock:
+        _recent_failures.append(now)
+        tripped = (not _TRIP.is_set()
+                   and len(_recent_failures) == _FAIL_THRESHOLD
+                   and now - _recent_failures[0] <= _FAIL_WINDOW)
+        if tripped:
+            _TRIP.set()
+    if tripped:
+        print(f"{_FAIL_WINDOW}秒内失败超过{_FAIL_THRESHOLD}次，熔断{_TRIP_COOLDOWN}秒...")
+        timer = threading.Timer(_TRIP_COOLDOWN, _reset_trip)
+        timer.daemon = True
+        timer.start()
 
 def fetch_word(word, max_retries=5, initial_delay=1):
     """
@@ -27,66 +71,246 @@ def fetch_word(word, max_retries=5, initial_delay=1):
     :param max_retries: 最大重试次数。
     :param initial_delay: 初始重试延迟（秒）。
     """
+    # 只读一次缓存：先in后[]两步读在条目恰好过期时会抛KeyError
+    cached = _CACHE.get(word)
+    if cached is not None:
+        return {word: cached}
     retries = 0
     while retries < max_retries:
+        if _TRIP.is_set():
+            return {word: None} # 熔断期间直接放弃，不再占着线程退避
         try:
             data = fetch_bing_dictionary(word)
             # 如果 fetch_bing_dictionary 成功返回数据，则认为成功
+            _CACHE.set(word, data, expire=_CACHE_TTL)
             return {word: data}
         except Exception as e: # 捕获所有可能来自 fetch_bing_dictionary 的异常
             if 'definitions' in str(e):
                 return {word: None}  # 如果是定义未找到的异常，直接返回 None
+            _record_failure()
             print(f"查询单词 '{word}' 失败: {e}，正在重试 ({retries + 1}/{max_retries})...")
             retries += 1
-            time.sleep(initial_delay * (2 ** (retries - 1))) # 指数退避重试
-    
+            # 指数退避（上限30秒），乘以0.5~1.5的随机抖动避免重试齐步走
+            time.sleep(min(30, initial_delay * (2 ** (retries - 1))) * (0.5 + random.random()))
+
     print(f"查询单词 '{word}' 失败，已达到最大重试次数。")
     return {word: None}
 
-def append_json_object_to_array(file_path, obj, lock):
+def fetch_word_html(word, max_retries=5, initial_delay=1):
+    """
+    抓取单词页面的原始HTML（带重试、抖动与熔断），解析交给进程池。
+    最终失败时返回 None。
+    """
+    retries = 0
+    while retries < max_retries:
+        if _TRIP.is_set():
+            return None # 熔断期间直接放弃，不再占着线程退避
+        try:
+            html = fetch_html(word)
+            # 被限流/出错时会返回不含正文容器的页面，视为一次可重试的失败
+            if CONTENT_MARKER not in html:
+                raise Exception(f"No dictionary content found for '{word}'.")
+            return html
+        except Exception as e:
+            _record_failure()
+            print(f"查询单词 '{word}' 失败: {e}，正在重试 ({retries + 1}/{max_retries})...")
+            retries += 1
+            time.sleep(min(30, initial_delay * (2 ** (retries - 1))) * (0.5 + random.random()))
+
+    print(f"查询单词 '{word}' 失败，已达到最大重试次数。")
+    return None
+
+def parse_word(word, html):
     """
-    线程安全地将一个对象追加到JSON数组文件中，始终保持文件为合法闭合的JSON数组。
+    在工作进程中解析HTML。"无释义"按惯例返回None结果，其余解析异常打印后同样返回None。
+    """
+    try:
+        return {word: parse_dictionary_html(word, html)}
+    except Exception as e:
+        if 'definitions' not in str(e):
+            print(f"解析单词 '{word}' 失败: {e}")
+        return {word: None}
+
+def _handle_parsed(word, q, pf):
+    """
+    解析future完成时的回调：结果立刻写缓存、交给写线程，
+    不等整批抓完——中途崩溃/中断时已完成的单词都已落盘、可续跑。
+    """
+    try:
+        result = pf.result()
+    except Exception as exc:
+        print(f"处理单词 '{word}' 的结果时发生异常: {exc}")
+        result = {word: None}
+    if result[word] is not None:
+        _CACHE.set(word, result[word], expire=_CACHE_TTL)
+    q.put(result)
+    print(f"单词 '{word}' 查询并写入完成.")
+
+def append_json_line(f, obj, lock):
+    """
+    线程安全地向已打开的JSON Lines文件追加一行（一行一个JSON对象）。
+    纯追加写，不需要像JSON数组那样每次seek回去改写闭合的']'。
     """
     with lock:
         try:
-            with open(file_path, 'r+', encoding='utf-8') as f:
-                f.seek(0, 2)
-                filesize = f.tell()
-                if filesize <= 2:  # 只包含 []
-                    f.seek(1)
-                    json.dump(obj, f, ensure_ascii=False, indent=2)
-                    f.write(']')
-                else:
-                    f.seek(filesize - 1)
-                    f.write(',\n')
-                    json.dump(obj, f, ensure_ascii=False, indent=2)
-                    f.write(']')
+            # orjson直接产出UTF-8 bytes（等价于ensure_ascii=False），文件需以二进制模式打开
+            f.write(orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE))
         except Exception as e:
             print(f"写入JSON文件时出错: {e}")
 
+def _writer_loop(q, f, batch_size=64):
+    """
+    写线程主循环：从队列取结果，攒够一批（或队列暂时空闲）才序列化落盘，
+    把JSON编码和磁盘写入从抓取线程中剥离出来。收到 None 哨兵后写完剩余缓冲并退出。
+    """
+    buf = []
+    pending = 0 # 距上次flush累计写入的对象数
+
+    def flush(force=False):
+        nonlocal pending
+        # 写失败也要清空缓冲继续取队列：写线程一旦死掉，
+        # 生产者会全部阻塞在满队列上（包括收尾的哨兵put），程序无法退出
+        try:
+            if buf:
+                f.write(b''.join(orjson.dumps(x, option=orjson.OPT_APPEND_NEWLINE) for x in buf))
+                pending += len(buf)
+            # flush只刷用户态缓冲（不fsync），每256个对象或空闲/收尾时执行一次，
+            # 把flush的系统调用开销摊薄到整批写入上
+            if pending and (force or pending >= 256):
+                f.flush()
+                pending = 0
+        except Exception as e:
+            print(f"写入JSON文件时出错: {e}")
+        finally:
+            buf.clear()
+
+    while True:
+        try:
+            item = q.get(timeout=1)
+        except queue.Empty:
+            flush(force=True) # 队列空闲时把已攒的内容落盘，保证"实时"可见
+            continue
+        if item is None:
+            break
+        buf.append(item)
+        if len(buf) >= batch_size:
+            flush()
+    flush(force=True)
+
 def batch_fetch_dictionary_multithread(input_file_path, output_json_path, max_workers=8):
     """
-    多线程批量查询单词并实时写入JSON文件（始终闭合数组）。
+    多线程批量查询单词并实时写入JSON Lines文件。
+    抓取线程只管网络请求（I/O），HTML解析进进程池用满多核（绕开GIL），
+    序列化和写盘由单独的写线程批量完成。
     """
-    words = read_words_from_txt(input_file_path) # 调用新的读取函数
-    print(f"共需查询 {len(words)} 个单词...")
-    # 初始化JSON文件为[]
-    with open(output_json_path, 'w', encoding='utf-8') as f:
-        f.write('[]')
-    lock = threading.Lock()
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_word = {executor.submit(fetch_word, word): word for word in words}
-        for future in as_completed(future_to_word):
-            word = future_to_word[future]
+    raw_words = read_words_from_txt(input_file_path) # 调用新的读取函数
+    words = list(dict.fromkeys(raw_words)) # 保序去重，重复单词不浪费网络和解析
+    if len(words) < len(raw_words):
+        print(f"去重移除 {len(raw_words) - len(words)} 个重复单词。")
+    # 命中缓存的单词不再进抓取池，直接顺序写入输出。
+    # 每个词只get一次并留住值：条目可能随时过期，读两次会有KeyError竞态
+    cached_entries = {}
+    pending = []
+    for w in words:
+        data = _CACHE.get(w)
+        if data is None:
+            pending.append(w)
+        else:
+            cached_entries[w] = data
+    words = pending
+    print(f"共需查询 {len(words)} 个单词（{len(cached_entries)} 个命中缓存，跳过抓取）...")
+    # 打开一次，1MiB用户态缓冲；每次运行重写整个文件——断点续跑靠缓存，
+    # 命中缓存的词会在下面重新写入，追加模式反而会让重跑产生重复行
+    with open(output_json_path, 'wb', buffering=1<<20) as f:
+        if cached_entries:
+            f.write(b''.join(orjson.dumps({w: data}, option=orjson.OPT_APPEND_NEWLINE) for w, data in cached_entries.items()))
+        q = queue.Queue(maxsize=256)
+        writer = threading.Thread(target=_writer_loop, args=(q, f))
+        writer.start()
+        try:
+            with ProcessPoolExecutor(max_workers=os.cpu_count()) as parse_pool, \
+                 ThreadPoolExecutor(max_workers=max_workers) as executor:
+                future_to_word = {executor.submit(fetch_word_html, word): word for word in words}
+                # 抓取完成的HTML立刻投给解析进程池，解析完成的回调即时写缓存、入写队列，
+                # 抓取和解析全程流水线推进；with块退出前会等所有解析future（连同回调）跑完
+                for future in as_completed(future_to_word):
+                    word = future_to_word[future]
+                    try:
+                        html = future.result()
+                    except Exception as exc:
+                        print(f"处理单词 '{word}' 的结果时发生异常: {exc}")
+                        continue
+                    if html is None:
+                        q.put({word: None})
+                        continue
+                    pf = parse_pool.submit(parse_word, word, html)
+                    pf.add_done_callback(functools.partial(_handle_parsed, word, q))
+        finally:
+            q.put(None) # 哨兵：通知写线程收尾
+            writer.join()
+    print(f"所有查询已完成，结果已实时保存到 {output_json_path}")
+
+async def fetch_word_async(client, word, semaphore, max_retries=5, initial_delay=1):
+    """
+    异步查询单个单词，失败时指数退避重试，逻辑与 fetch_word 一致。
+    """
+    from bing_async import fetch_bing_dictionary_async
+    cached = _CACHE.get(word)
+    if cached is not None:
+        return {word: cached}
+    retries = 0
+    async with semaphore:
+        while retries < max_retries:
             try:
-                result = future.result()
-                append_json_object_to_array(output_json_path, result, lock)
-                print(f"单词 '{word}' 查询并写入完成.")
-            except Exception as exc:
-                print(f"处理单词 '{word}' 的结果时发生异常: {exc}")
+                data = await fetch_bing_dictionary_async(client, word)
+                _CACHE.set(word, data, expire=_CACHE_TTL)
+                return {word: data}
+            except Exception as e:
+                if 'definitions' in str(e):
+                    return {word: None}
+                print(f"查询单词 '{word}' 失败: {e}，正在重试 ({retries + 1}/{max_retries})...")
+                retries += 1
+                await asyncio.sleep(min(30, initial_delay * (2 ** (retries - 1))) * (0.5 + random.random()))
+
+    print(f"查询单词 '{word}' 失败，已达到最大重试次数。")
+    return {word: None}
+
+def batch_fetch_dictionary_async(input_file_path, output_json_path, max_concurrency=64):
+    """
+    基于 asyncio + httpx 的批量查询：上百个在途请求共用少量连接，
+    没有线程栈开销。作为多线程版本的替代入口（需要安装httpx）。
+    """
+    from bing_async import create_async_client
+
+    raw_words = read_words_from_txt(input_file_path)
+    words = list(dict.fromkeys(raw_words)) # 保序去重，重复单词不浪费网络和解析
+    if len(words) < len(raw_words):
+        print(f"去重移除 {len(raw_words) - len(words)} 个重复单词。")
+    print(f"共需查询 {len(words)} 个单词...")
+    file_lock = threading.Lock()
+    write_lock = asyncio.Lock()
+
+    async def main():
+        semaphore = asyncio.Semaphore(max_concurrency)
+        written = 0
+        # 每次运行重写整个文件，断点续跑靠缓存（命中缓存的词直接返回并重新写入）
+        with open(output_json_path, 'wb', buffering=1<<20) as f:
+            async with create_async_client() as client:
+                tasks = [asyncio.ensure_future(fetch_word_async(client, word, semaphore)) for word in words]
+                for future in asyncio.as_completed(tasks):
+                    result = await future
+                    word = next(iter(result))
+                    async with write_lock:
+                        append_json_line(f, result, file_lock)
+                        written += 1
+                        if written % 256 == 0:
+                            f.flush()
+                    print(f"单词 '{word}' 查询并写入完成.")
+
+    asyncio.run(main())
     print(f"所有查询已完成，结果已实时保存到 {output_json_path}")
 
 if __name__ == "__main__":
     input_txt = 'coca60000.txt' # 将输入文件改为.txt
-    output_json = 'dictionary.json'
+    output_json = 'dictionary.jsonl'
     batch_fetch_dictionary_multithread(input_txt, output_json, max_workers=32)
\ No newline at end of file
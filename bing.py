@@ -1,41 +1,95 @@
-import requests
-from bs4 import BeautifulSoup
+import functools
 import json
-from urllib.parse import urlencode
+import re
+from itertools import zip_longest
+from urllib.parse import quote, urlencode
+
+@functools.cache
+def _get_session():
+    """
+    延迟构建模块级会话：requests/urllib3的导入和TLS池初始化只在第一次
+    真正发请求时发生，只用文本清理/解析函数的调用方不必买单。
+    所有请求复用同一批TLS连接，避免每次查询都重新握手；
+    pool_maxsize 要不小于 batch.py 的 max_workers（32），否则线程会争抢连接。
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=0))
+    session.headers.update({
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+        'Accept-Encoding': 'br, gzip',
+    })
+    return session
+
+# 建DOM之前先做bytes级子串检查（C层memmem），注定被拒绝的页面不浪费解析
+CONTENT_MARKER = b'client_search_content'
+NL_MARKER = b'clientnlid'
+
+# 预编译（只编译一次）：标点前多余空格的六种替换合并成一趟正则扫描，
+# 全角斜杠的替换走translate的单字符映射表
+_RE_CLEAN = re.compile(r' ([.,?!:;])')
+_FW_SLASH_TABLE = str.maketrans({'／': ' / '})
 
 def process_text_cleanup(text):
     """
     处理文本中的标点符号和全角斜杠。
     - 将中文全角斜杠“／”替换为英文斜杠“ / ”。
-    - 移除英文标点符号前多余的空格。
+    - 移除英文标点符号前多余的空格，例如 "word ." 变成 "word."。
     """
     if not isinstance(text, str):
         return ""
-    text = text.replace('／', ' / ') # 替换全角斜杠
-    # 移除标点符号前的多余空格
-    # 例如 "word ." 变成 "word."
-    text = text.replace(' .', '.').replace(' ,', ',').replace(' ?', '?').replace(' !', '!')
-    text = text.replace(' :', ':').replace(' ;', ';')
-    return text
+    # 快速路径：多数字符串（义项编号、词性标记等）既无全角斜杠也无空格，
+    # 两次C层子串检查后原样返回，零分配
+    if '／' not in text and ' ' not in text:
+        return text
+    return _RE_CLEAN.sub(r'\1', text.translate(_FW_SLASH_TABLE))
+
+def _text(node):
+    """
+    返回节点strip后的文本，节点为None时返回''，免去到处写 `x.text().strip() if x else ''`。
+    """
+    return node.text().strip() if node else ''
+
+# 热路径（逐义项、逐例句循环）用到的CSS选择器集中定义一次：
+# 页面结构变化时只需要改这一处，循环体内也不再散落字符串字面量
+_SEL_EXAMBAR = 'div.exambar'
+_SEL_EXAMLISTITEM = 'div.examlistitem'
+_SEL_EXAM_EN = 'div.examitmeval'
+_SEL_EXAM_CN = 'div.examitemname'
+_SEL_DEFEACHSEG = 'div.defeachseg'
+_SEL_DEFPOS = 'span.defpos'
+_SEL_DEFLISTSEG = 'div.deflistseg'
+_SEL_DEFLISTITEM = 'div.deflistitem'
+_SEL_DEFNUM = 'div.defnum'
+_SEL_DEFITEMCON = 'div.defitemcon'
+_SEL_DEFITEMTITLE = 'div.defitemtitle'
+_SEL_ITEMNAME = 'span.itemname'
+_SEL_ITMEVAL = 'span.itmeval'
+_SEL_DEFGRA = 'span.defgra'
+_SEL_IDOMBAR = 'div.idombar'
+_SEL_IDOM_TITLEBAR = 'div.defitemtitlebar'
+_SEL_IDOM_DEFBAR = 'div.defitembar'
+_SEL_DEFITEM = 'div.defitem'
 
 def extract_examples(item_container):
     """
     从释义条目容器中提取例句。
     """
-    examples = []
-    exambar = item_container.find('div', class_='exambar')
+    exambar = item_container.css_first(_SEL_EXAMBAR)
     if not exambar:
-        return examples
-    
-    for ex in exambar.find_all('div', class_='examlistitem'):
-        en_ex = ex.find('div', class_='examitmeval')
-        cn_ex = ex.find('div', class_='examitemname')
-        if en_ex and cn_ex:
-            examples.append({
-                'English': process_text_cleanup(en_ex.text.strip()),
-                'Chinese': process_text_cleanup(cn_ex.text.strip())
-            })
-    return examples
+        return []
+
+    # 列表推导式走专用的LIST_APPEND字节码，省去逐次的.append方法调用
+    return [
+        {
+            'English': process_text_cleanup(en_ex.text().strip()),
+            'Chinese': process_text_cleanup(cn_ex.text().strip())
+        }
+        for ex in exambar.css(_SEL_EXAMLISTITEM)
+        if (en_ex := ex.css_first(_SEL_EXAM_EN)) and (cn_ex := ex.css_first(_SEL_EXAM_CN))
+    ]
 
 def extract_nl_definitions(nl_tab):
     """
@@ -44,53 +98,51 @@ def extract_nl_definitions(nl_tab):
     """
     definitions = []
     # 查找所有主要词性分段 (e.g., v., n.)
-    segments = nl_tab.find_all('div', class_='defeachseg')
+    segments = nl_tab.css(_SEL_DEFEACHSEG)
     for seg in segments:
-        pos_element = seg.find('span', class_='defpos')
-        pos_text = pos_element.text.strip() if pos_element else ''
+        pos_text = _text(seg.css_first(_SEL_DEFPOS))
 
         senses = []
-        deflistseg = seg.find('div', class_='deflistseg')
+        deflistseg = seg.css_first(_SEL_DEFLISTSEG)
         if deflistseg:
             # 遍历每个释义条目
-            for item in deflistseg.find_all('div', class_='deflistitem'):
-                sense_num_element = item.find('div', class_='defnum')
-                sense_num_text = sense_num_element.text.strip() if sense_num_element else ''
+            for item in deflistseg.css(_SEL_DEFLISTITEM):
+                # 一次遍历直接子div并按class归类，代替对同一子树的多次查找；
+                # 个别条目结构有出入时回退到递归查找，保证解析结果不变
+                children = {}
+                for c in item.iter(include_text=False):
+                    if c.tag != 'div':
+                        continue
+                    cls = (c.attributes.get('class') or '').split()
+                    children.setdefault(cls[0] if cls else '', c)
+
+                sense_num_text = _text(children.get('defnum') or item.css_first(_SEL_DEFNUM))
 
                 # 定位到包含真正释义的容器
-                defitemcon = item.find('div', class_='defitemcon')
+                defitemcon = children.get('defitemcon') or item.css_first(_SEL_DEFITEMCON)
                 if not defitemcon:
                     continue
 
                 # 提取高级别的分组标题 (例如 "处所；位置")
                 sense_group = {}
-                defitemtitle = item.find('div', class_='defitemtitle')
+                defitemtitle = children.get('defitemtitle') or item.css_first(_SEL_DEFITEMTITLE)
                 if defitemtitle:
-                    group_cn = defitemtitle.find('span', class_='itemname')
-                    group_en = defitemtitle.find('span', 'itmeval')
-                    sense_group['Chinese'] = process_text_cleanup(group_cn.text.strip()) if group_cn else ''
-                    sense_group['English'] = process_text_cleanup(group_en.text.strip()) if group_en else ''
+                    sense_group['Chinese'] = process_text_cleanup(_text(defitemtitle.css_first(_SEL_ITEMNAME)))
+                    sense_group['English'] = process_text_cleanup(_text(defitemtitle.css_first(_SEL_ITMEVAL)))
 
                 # 从 'defitemcon' 中提取具体的释义
-                def_cn_element = defitemcon.find('span', class_='itemname')
-                def_cn_text = process_text_cleanup(def_cn_element.text.strip()) if def_cn_element else ''
+                def_cn_text = process_text_cleanup(_text(defitemcon.css_first(_SEL_ITEMNAME)))
 
                 # 英文释义通常是最后一个 'itmeval' span
-                all_itmeval = defitemcon.find_all('span', class_='itmeval')
-                def_en_text = process_text_cleanup(all_itmeval[-1].text.strip()) if all_itmeval else ''
+                all_itmeval = defitemcon.css(_SEL_ITMEVAL)
+                def_en_text = process_text_cleanup(_text(all_itmeval[-1])) if all_itmeval else ''
 
                 # 用法模式通常在 'strong' 标签中
-                pattern = ''
-                strong_tag = defitemcon.find('strong')
-                if strong_tag:
-                    pattern = process_text_cleanup(strong_tag.text.strip())
-                
+                pattern = process_text_cleanup(_text(defitemcon.css_first('strong')))
+
                 # 提取语法标签 [i], [t]
-                grammar_tags = []
-                for gra in item.find_all('span', class_='defgra'):
-                    tag_text = gra.text.strip()
-                    if tag_text in ['[i]', '[t]']:
-                        grammar_tags.append(tag_text)
+                grammar_tags = [t for gra in item.css(_SEL_DEFGRA)
+                                if (t := gra.text().strip()) in ('[i]', '[t]')]
 
                 # 使用辅助函数提取例句
                 examples = extract_examples(item)
@@ -106,34 +158,34 @@ def extract_nl_definitions(nl_tab):
 
         # 提取习语
         idioms = []
-        idom_bars = seg.find_all('div', class_='idombar')
+        idom_bars = seg.css(_SEL_IDOMBAR)
         for idom_bar in idom_bars:
-            title_bars = idom_bar.find_all('div', class_='defitemtitlebar')
-            def_bars = idom_bar.find_all('div', class_='defitembar')
-            
-            for i, title_bar in enumerate(title_bars):
-                idiom_title = title_bar.find('div', class_='defitemtitle')
+            title_bars = idom_bar.css(_SEL_IDOM_TITLEBAR)
+            def_bars = idom_bar.css(_SEL_IDOM_DEFBAR)
+
+            # 标题栏和释义栏按位置一一配对；标题驱动条目，多出来的释义栏照旧忽略
+            for title_bar, def_bar in zip_longest(title_bars, def_bars):
+                if title_bar is None:
+                    break
+                idiom_title = title_bar.css_first(_SEL_DEFITEMTITLE)
                 idiom_title_text = ''
                 if idiom_title:
-                    title_span = idiom_title.find('span', class_='itmeval')
+                    title_span = idiom_title.css_first(_SEL_ITMEVAL)
                     if title_span:
-                        idiom_title_text = process_text_cleanup(title_span.text.strip())
-                
+                        idiom_title_text = process_text_cleanup(title_span.text().strip())
+
                 idiom_def_cn_text = ''
                 idiom_def_en_text = ''
                 idiom_examples = []
-                
-                if i < len(def_bars):
-                    def_bar = def_bars[i]
-                    def_item = def_bar.find('div', class_='defitem')
+
+                if def_bar is not None:
+                    def_item = def_bar.css_first(_SEL_DEFITEM)
                     if def_item:
-                        def_item_con = def_item.find('div', class_='defitemcon')
+                        def_item_con = def_item.css_first(_SEL_DEFITEMCON)
                         if def_item_con:
-                            idiom_def_cn = def_item_con.find('span', class_='itemname')
-                            idiom_def_en = def_item_con.find('span', class_='itmeval')
-                            idiom_def_cn_text = process_text_cleanup(idiom_def_cn.text.strip()) if idiom_def_cn else ''
-                            idiom_def_en_text = process_text_cleanup(idiom_def_en.text.strip()) if idiom_def_en else ''
-                        
+                            idiom_def_cn_text = process_text_cleanup(_text(def_item_con.css_first(_SEL_ITEMNAME)))
+                            idiom_def_en_text = process_text_cleanup(_text(def_item_con.css_first(_SEL_ITMEVAL)))
+
                         idiom_examples = extract_examples(def_item)
 
                 idioms.append({
@@ -149,64 +201,77 @@ def extract_nl_definitions(nl_tab):
         })
     return definitions
 
-def fetch_bing_dictionary(word, mkt='zh-CN', set_lang='zh', client_ver='BDDTV3.5.1.4320', form='BDVEHC'):
+# 默认参数下的静态查询前缀：五个参数里四个是常量，没必要每次都urlencode
+_DEFAULT_PARAMS = ('zh-CN', 'zh', 'BDDTV3.5.1.4320', 'BDVEHC')
+_URL_PREFIX = 'https://cn.bing.com/dict/clientsearch?mkt=zh-CN&setLang=zh&form=BDVEHC&ClientVer=BDDTV3.5.1.4320&q='
+
+@functools.lru_cache(maxsize=None)
+def _query_prefix(mkt, set_lang, client_ver, form):
     """
-    从必应词典抓取单词的词典条目。
+    非默认参数组合的固定前缀：每种组合只urlencode一次，之后命中缓存。
+    """
+    fixed = urlencode({'mkt': mkt, 'setLang': set_lang, 'form': form, 'ClientVer': client_ver})
+    return f"https://cn.bing.com/dict/clientsearch?{fixed}&q="
+
+def build_search_url(word, mkt='zh-CN', set_lang='zh', client_ver='BDDTV3.5.1.4320', form='BDVEHC'):
+    """
+    构造必应词典 clientsearch 接口的查询URL。
+    固定参数部分按组合缓存，每次调用只对单词本身做一次quote。
+    """
+    if (mkt, set_lang, client_ver, form) == _DEFAULT_PARAMS:
+        return _URL_PREFIX + quote(word, safe='')
+    return _query_prefix(mkt, set_lang, client_ver, form) + quote(word, safe='')
+
+def parse_dictionary_html(word, html):
+    """
+    解析必应词典返回的HTML，提取词典条目。
     抓取“权威英汉双解”部分，并包含搭配、同义词和反义词。
     """
-    # 构造带查询参数的URL
-    base_url = 'https://cn.bing.com/dict/clientsearch'
-    params = {
-        'mkt': mkt,
-        'setLang': set_lang,
-        'form': form,
-        'ClientVer': client_ver,
-        'q': word
-    }
-    url = f"{base_url}?{urlencode(params)}"
-    
-    # 发送HTTP请求
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status() # 对 4xx/5xx 响应抛出 HTTPError
-    except requests.RequestException as e:
-        # 捕获网络请求异常，并重新抛出自定义异常
-        raise Exception(f"Failed to fetch data for '{word}': {str(e)}")
-    
-    # 解析HTML内容
-    soup = BeautifulSoup(response.text, 'html.parser')
-    content = soup.find('div', class_='client_search_content')
+    # 快速拒绝：查不到的词（60k词表里占比不小）不值得建DOM
+    if isinstance(html, bytes):
+        start = html.find(CONTENT_MARKER)
+        if start == -1:
+            raise Exception(f"No dictionary content found for '{word}'. Possible word not found or page structure changed.")
+        if NL_MARKER not in html:
+            raise Exception(f"No '权威英汉双解' definitions found for '{word}'.")
+        # 正文容器之前的头部、样式、脚本对提取毫无用处，按bytes回退到
+        # 包含正文标记的<div开头再解析，少建一截DOM。只切头不切尾，
+        # 就算标记出现得比正文容器早，切出来的也只会是超集，不会丢内容
+        div_start = html.rfind(b'<div', 0, start)
+        if div_start != -1:
+            html = html[div_start:]
+    # Lexbor是C实现的HTML5解析器，建树和CSS选择都在原生代码里完成；直接传bytes。
+    # 函数内导入：首次之后只是sys.modules查找，纯文本工具的使用方不用加载C扩展
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(html)
+    content = tree.css_first('div.client_search_content')
     if not content:
         # 如果没有找到主要内容区域，说明查询失败或页面结构变化
         raise Exception(f"No dictionary content found for '{word}'. Possible word not found or page structure changed.")
-    
-    left_side = content.find('div', class_='client_search_leftside_area')
-    right_side = content.find('div', class_='client_search_rightside_area')
-    
+
+    left_side = content.css_first('div.client_search_leftside_area')
+    right_side = content.css_first('div.client_search_rightside_area')
+
     # 提取词头
-    headword = left_side.find('div', class_='client_def_hd_hd').text.strip() if left_side and left_side.find('div', class_='client_def_hd_hd') else ''
-    
+    headword = _text(left_side.css_first('div.client_def_hd_hd')) if left_side else ''
+
     # 提取发音
     pronunciations = {}
-    pron_lists = left_side.find_all('div', class_='client_def_hd_pn_list') if left_side else []
+    pron_lists = left_side.css('div.client_def_hd_pn_list') if left_side else []
     if len(pron_lists) >= 2:
-        pron_us_container = pron_lists[0]
-        pron_uk_container = pron_lists[1]
-        
-        pron_us = pron_us_container.find('div', class_='client_def_hd_pn')
-        if pron_us and '美' in pron_us.get_text():
-            pronunciations['US'] = pron_us.get_text().replace('美', '').strip()
+        # 每个节点的文本只取一次：text()每次都要重新遍历子树拼接字符串
+        us_text = _text(pron_lists[0].css_first('div.client_def_hd_pn'))
+        if '美' in us_text:
+            pronunciations['US'] = us_text.replace('美', '').strip()
 
-        pron_uk = pron_uk_container.find('div', class_='client_def_hd_pn')
-        if pron_uk and '英' in pron_uk.get_text():
-            pronunciations['UK'] = pron_uk.get_text().replace('英', '').strip()
+        uk_text = _text(pron_lists[1].css_first('div.client_def_hd_pn'))
+        if '英' in uk_text:
+            pronunciations['UK'] = uk_text.replace('英', '').strip()
 
     # 提取“权威英汉双解”释义
     definitions = []
-    nl_tab = content.find('div', id='clientnlid') # 查找权威英汉双解的ID
+    nl_tab = content.css_first('div#clientnlid') # 查找权威英汉双解的ID
     if nl_tab:
         definitions = extract_nl_definitions(nl_tab)
     else:
@@ -217,24 +282,24 @@ def fetch_bing_dictionary(word, mkt='zh-CN', set_lang='zh', client_ver='BDDTV3.5
     collocations = []
     synonyms = []
     antonyms = []
-    if right_side:
-        for side_bar in right_side.find_all('div', class_='client_side_bar'):
-            title = side_bar.find('div', class_='client_side_title').text.strip() if side_bar.find('div', class_='client_side_title') else ''
-            if title == '搭配':
-                for content_div in side_bar.find_all('div', class_='client_siderbar_content'):
-                    type_ = content_div.find('span', class_='client_siderbar_list_title').text.strip() if content_div.find('span', class_='client_siderbar_list_title') else ''
-                    items = [item.text.strip() for item in content_div.find_all('a', class_='client_siderbar_list_word')]
-                    collocations.append({'type': type_, 'items': items})
-            elif title == '同义词':
-                for content_div in side_bar.find_all('div', class_='client_siderbar_content'):
-                    pos = content_div.find('span', class_='client_siderbar_list_title').text.strip() if content_div.find('span', class_='client_siderbar_list_title') else ''
-                    items = [item.text.strip() for item in content_div.find_all('a', class_='client_siderbar_list_word')]
-                    synonyms.append({'part_of_speech': pos, 'items': items})
-            elif title == '反义词':
-                for content_div in side_bar.find_all('div', class_='client_siderbar_content'):
-                    pos = content_div.find('span', class_='client_siderbar_list_title').text.strip() if content_div.find('span', class_='client_siderbar_list_title') else ''
-                    items = [item.text.strip() for item in content_div.find_all('a', class_='client_siderbar_list_word')]
-                    antonyms.append({'part_of_speech': pos, 'items': items})
+    # 很多单词根本没有侧边栏，一次性取出所有栏目，空列表时下面的循环直接跳过。
+    # 三个栏目的提取逻辑完全相同，只是目标列表和键名不同，用表驱动一个循环搞定
+    sidebar_map = {
+        '搭配': (collocations, 'type'),
+        '同义词': (synonyms, 'part_of_speech'),
+        '反义词': (antonyms, 'part_of_speech'),
+    }
+    side_bars = right_side.css('div.client_side_bar') if right_side else []
+    for side_bar in side_bars:
+        title = _text(side_bar.css_first('div.client_side_title'))
+        target = sidebar_map.get(title)
+        if target is None:
+            continue # 不认识的栏目不做内容遍历
+        dst, key = target
+        for content_div in side_bar.css('div.client_siderbar_content'):
+            label = _text(content_div.css_first('span.client_siderbar_list_title'))
+            items = [item.text().strip() for item in content_div.css('a.client_siderbar_list_word')]
+            dst.append({key: label, 'items': items})
     
     # 组织结果
     result = {
@@ -247,6 +312,32 @@ def fetch_bing_dictionary(word, mkt='zh-CN', set_lang='zh', client_ver='BDDTV3.5
     }
     return result
 
+def fetch_html(word, mkt='zh-CN', set_lang='zh', client_ver='BDDTV3.5.1.4320', form='BDVEHC'):
+    """
+    只负责网络请求，返回页面原始HTML（bytes）；解析由 parse_dictionary_html 完成。
+    拆开是为了让批量任务把纯CPU的解析放进进程池，绕开GIL。
+    """
+    import requests
+
+    url = build_search_url(word, mkt=mkt, set_lang=set_lang, client_ver=client_ver, form=form)
+
+    # 发送HTTP请求（复用惰性构建的会话连接池，UA等头已在会话上设置）
+    try:
+        response = _get_session().get(url, timeout=10)
+        response.raise_for_status() # 对 4xx/5xx 响应抛出 HTTPError
+    except requests.RequestException as e:
+        # 捕获网络请求异常，并重新抛出自定义异常
+        raise Exception(f"Failed to fetch data for '{word}': {str(e)}")
+
+    return response.content
+
+def fetch_bing_dictionary(word, mkt='zh-CN', set_lang='zh', client_ver='BDDTV3.5.1.4320', form='BDVEHC'):
+    """
+    从必应词典抓取单词的词典条目（同步版本，抓取+解析一步到位）。
+    """
+    html = fetch_html(word, mkt=mkt, set_lang=set_lang, client_ver=client_ver, form=form)
+    return parse_dictionary_html(word, html)
+
 # 示例用法
 if __name__ == "__main__":
     # 使用 'put' 作为测试单词来验证修复效果
@@ -0,0 +1,52 @@
+import asyncio
+
+import httpx
+
+from bing import build_search_url, parse_dictionary_html
+
+# 默认连接上限：少量长连接即可承载上百个并发请求（HTTP/2多路复用）。
+DEFAULT_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=32)
+
+def create_async_client(timeout=10):
+    """
+    创建用于并发查询的 httpx.AsyncClient（启用HTTP/2与连接复用）。
+    """
+    return httpx.AsyncClient(
+        http2=True,
+        limits=DEFAULT_LIMITS,
+        timeout=timeout,
+        headers={
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            'Accept-Encoding': 'br, gzip',
+        },
+    )
+
+async def fetch_bing_dictionary_async(client, word, mkt='zh-CN', set_lang='zh', client_ver='BDDTV3.5.1.4320', form='BDVEHC'):
+    """
+    从必应词典抓取单词的词典条目（异步版本，复用传入的client）。
+    """
+    url = build_search_url(word, mkt=mkt, set_lang=set_lang, client_ver=client_ver, form=form)
+    try:
+        response = await client.get(url)
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        raise Exception(f"Failed to fetch data for '{word}': {str(e)}")
+
+    # 解析是纯CPU工作，丢到线程里做，避免长页面把事件循环卡住
+    return await asyncio.to_thread(parse_dictionary_html, word, response.content)
+
+async def fetch_many(words):
+    """
+    并发查询一批单词，返回 {word: 词典条目或None}。
+    适合小批量的即查即用场景；大批量带重试/缓存/落盘的场景用 batch.py。
+    """
+    async with create_async_client() as client:
+        async def one(word):
+            try:
+                return word, await fetch_bing_dictionary_async(client, word)
+            except Exception as e:
+                print(f"查询 '{word}' 失败: {e}")
+                return word, None
+
+        pairs = await asyncio.gather(*(one(w) for w in words))
+    return dict(pairs)